@@ -0,0 +1,59 @@
+import threading
+
+# Batches contain thousands of rows but only a few dozen distinct addresses, so
+# every address is stored once here and referred to by its integer code. When a
+# backend returns address components (suburb, city, ...) they are kept next to
+# the code, so rows can be grouped by component without parsing addresses.
+class AddressPool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.codes = {}
+        self.addresses = []
+        self.details = []
+
+    def code(self, address, details=None):
+        code = self.codes.get(address)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(address)
+                if code is None:
+                    code = len(self.addresses)
+                    self.addresses.append(address)
+                    self.details.append(details)
+                    self.codes[address] = code
+        if details and not self.details[code]:
+            self.details[code] = details
+        return code
+
+    def intern(self, address, details=None):
+        return self.addresses[self.code(address, details)]
+
+    def address(self, code):
+        return self.addresses[code]
+
+    def address_details(self, code):
+        return self.details[code]
+
+    def component(self, code, key):
+        details = self.details[code]
+        return details.get(key) if details else None
+
+    # The pool code of a component such as the suburb, or None when it is unknown
+    def component_code(self, code, key):
+        value = self.component(code, key)
+        return self.code(value) if value else None
+
+    def compact(self, codes):
+        remap = {}
+        categories = []
+        compacted = []
+        for code in codes:
+            local_code = remap.get(code)
+            if local_code is None:
+                local_code = len(categories)
+                remap[code] = local_code
+                categories.append(self.addresses[code])
+            compacted.append(local_code)
+        return compacted, categories
+
+address_pool = AddressPool()
@@ -0,0 +1,40 @@
+import os
+from hedged_service import HedgedGeocodingService
+from reverse_geocoding_service import ReverseGeocodingService
+
+BACKENDS_ENV_VAR = 'GPS_FORMATTER_BACKENDS'
+BACKEND_NAMES = ('nominatim', 'google')
+
+# Set GPS_FORMATTER_BACKENDS to a comma separated priority list such as
+# nominatim,google to hedge slow requests to the next backend; without it each
+# front end uses its own default backend alone.
+def backend_priority(default):
+    value = os.environ.get(BACKENDS_ENV_VAR, '')
+    names = [name.strip() for name in value.split(',') if name.strip()] or [default]
+    for name in names:
+        if name not in BACKEND_NAMES:
+            raise ValueError(f"Unknown backend in {BACKENDS_ENV_VAR}: {name}")
+    return names
+
+# Background work (cache refreshes and warm-ups) must reach the network, so
+# Google skips its local database of previous answers there
+def create_backend(name, background=False, address_details=False):
+    if name == 'google':
+        # Imported here so Nominatim runs need neither googlemaps nor an API key
+        from google_geocoding_service import GoogleGeocodingService
+        return GoogleGeocodingService(check_local_db=not background)
+    return ReverseGeocodingService(address_details=address_details)
+
+def create_service(names, address_details=False):
+    services = [create_backend(name, address_details=address_details) for name in names]
+    if len(services) == 1:
+        return services[0]
+    return HedgedGeocodingService(services)
+
+# Refreshes and warm-ups go to the first backend only
+def create_background_service(names, address_details=False):
+    return create_backend(names[0], background=True, address_details=address_details)
+
+# Matches the provider name of the service create_service builds
+def service_provider(names):
+    return '+'.join(names)
@@ -0,0 +1,72 @@
+import logging
+import queue
+import threading
+from geocode_cache import cell_for, cell_center
+from rate_limiter import RateLimiter
+from reverse_geocoding_service import GEOCODING_ERROR
+
+# Re-queries stale cache entries on a daemon thread. It spends at most `share`
+# of the backend's request rate, and also waits on the backend's own rate
+# limiter, so foreground lookups never exceed the backend's budget.
+class BackgroundRefresher:
+    def __init__(self, service, cache, share=0.1, max_queued=1000):
+        self.service = service
+        self.cache = cache
+        requests_per_second = service.rate_limiter.requests_per_second
+        self.rate_limiter = RateLimiter(requests_per_second * share if requests_per_second else None)
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.refreshed = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Never blocks; requests are dropped while the queue is full
+    def submit(self, coordinates, resolution):
+        key = (resolution,) + cell_for(coordinates.latitude, coordinates.longitude, resolution)
+        with self.lock:
+            if key in self.queued:
+                return
+            try:
+                self.queue.put_nowait((key, coordinates))
+            except queue.Full:
+                return
+            self.queued.add(key)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            key, coordinates = item
+            try:
+                self.rate_limiter.wait()
+                refresh_cell(self.service, self.cache, key[0], key[1:], coordinates)
+                self.refreshed += 1
+            except Exception as e:
+                logging.error(f"Error refreshing cache entry {key}: {e}")
+            finally:
+                with self.lock:
+                    self.queued.discard(key)
+
+    def stop(self):
+        self.queue.put(None)
+
+def refresh_cell(service, cache, resolution, cell, coordinates=None):
+    if coordinates is None:
+        coordinates = cell_center(resolution, *cell)
+    service.rate_limiter.wait()
+    address = service.get_address(coordinates, resolution)
+    if address == GEOCODING_ERROR:
+        return False
+    cache.put_cell(resolution, cell, address)
+    return True
+
+# Maintenance for idle hours: re-queries the n least recently fetched entries at
+# the backend's full rate and returns how many were refreshed.
+def refresh_oldest(service, cache, n):
+    refreshed = 0
+    for resolution, cell_latitude, cell_longitude in cache.oldest(n):
+        if refresh_cell(service, cache, resolution, (cell_latitude, cell_longitude)):
+            refreshed += 1
+    return refreshed
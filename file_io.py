@@ -0,0 +1,99 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+EXCEL_EXTENSIONS = ('.xlsx',)
+CSV_EXTENSIONS = ('.csv',)
+PARQUET_EXTENSIONS = ('.parquet',)
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+SUPPORTED_EXTENSIONS = EXCEL_EXTENSIONS + CSV_EXTENSIONS + PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+OUTPUT_SUFFIX = "_with_end_destinations"
+FILE_DIALOG_FILTER = 'Data Files (*.xlsx *.csv *.parquet *.arrow *.feather *.ipc);;All Files (*)'
+FILE_DIALOG_TYPES = (("Data files", "*.xlsx *.csv *.parquet *.arrow *.feather *.ipc"), ("All files", "*.*"))
+
+def file_extension(file_path):
+    return os.path.splitext(file_path)[1].lower()
+
+def output_file_path(file_path):
+    root, extension = os.path.splitext(file_path)
+    return root + OUTPUT_SUFFIX + extension
+
+# Excel files are loaded into a pandas DataFrame. Every other format is kept as a
+# pyarrow Table so the untouched columns stay in their original (memory mapped
+# where possible) Arrow buffers and are written back out without a copy.
+def read_table(file_path):
+    extension = file_extension(file_path)
+    if extension in EXCEL_EXTENSIONS:
+        return pd.read_excel(file_path)
+    if os.path.getsize(file_path) == 0:
+        raise pd.errors.EmptyDataError("The selected file is empty.")
+    if extension in CSV_EXTENSIONS:
+        return pa_csv.read_csv(file_path, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    if extension in PARQUET_EXTENSIONS:
+        return pq.read_table(file_path, memory_map=True)
+    if extension in ARROW_EXTENSIONS:
+        return feather.read_table(file_path, memory_map=True)
+    raise ValueError(f"Unsupported file type: {extension}")
+
+def write_table(table, file_path):
+    extension = file_extension(file_path)
+    if extension in EXCEL_EXTENSIONS:
+        if isinstance(table, pa.Table):
+            table = table.to_pandas()
+        table.to_excel(file_path, index=False)
+        return
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    if extension in CSV_EXTENSIONS:
+        pa_csv.write_csv(table, file_path)
+    elif extension in PARQUET_EXTENSIONS:
+        pq.write_table(table, file_path)
+    elif extension in ARROW_EXTENSIONS:
+        feather.write_feather(table, file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+def _string_column(table, column_name):
+    column = table.column(column_name)
+    if not pa.types.is_string(column.type):
+        column = column.cast(pa.string())
+    return column
+
+def column_values(table, column_name):
+    if isinstance(table, pd.DataFrame):
+        return ["" if pd.isna(value) else str(value) for value in table[column_name]]
+    return ["" if value is None else value for value in _string_column(table, column_name).to_pylist()]
+
+def set_column(table, column_name, values):
+    if isinstance(table, pd.DataFrame):
+        table[column_name] = values
+        return table
+    column = pa.array(values, type=pa.string())
+    index = table.schema.get_field_index(column_name)
+    if index == -1:
+        return table.append_column(column_name, column)
+    return table.set_column(index, column_name, column)
+
+# Stores the column dictionary encoded: a pandas categorical for Excel, an Arrow
+# dictionary array for everything else.
+def set_category_column(table, column_name, codes, categories):
+    if isinstance(table, pd.DataFrame):
+        table[column_name] = pd.Categorical.from_codes(codes, categories=categories)
+        return table
+    column = pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(categories, type=pa.string()))
+    index = table.schema.get_field_index(column_name)
+    if index == -1:
+        return table.append_column(column_name, column)
+    return table.set_column(index, column_name, column)
+
+def drop_blank_rows(table, column_name):
+    if isinstance(table, pd.DataFrame):
+        table = table.dropna(subset=[column_name])
+        return table[table[column_name].astype(str).str.strip() != '']
+    column = pc.utf8_trim_whitespace(_string_column(table, column_name))
+    return table.filter(pc.fill_null(pc.not_equal(column, ''), False))
@@ -0,0 +1,114 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from address_pool import address_pool
+from gps_coordinates import GpsCoordinates
+
+# Size in degrees of the grid cell a cached result covers at each resolution.
+# Every level divides the one above it evenly, so a city cell holds exactly
+# 10 x 10 suburb cells and a suburb cell 100 x 100 street cells. Street cells
+# are about 11 m across so neighbouring streets do not share an answer.
+CELL_SIZES = {
+    'building': 0.00001,
+    'street': 0.0001,
+    'suburb': 0.01,
+    'city': 0.1,
+}
+
+# Entries older than this are still served but get refreshed in the background
+DEFAULT_TTL_SECONDS = 90 * 24 * 60 * 60
+
+def cell_for(latitude, longitude, resolution):
+    size = CELL_SIZES[resolution]
+    return math.floor(latitude / size + 1e-9), math.floor(longitude / size + 1e-9)
+
+def cell_center(resolution, cell_latitude, cell_longitude):
+    size = CELL_SIZES[resolution]
+    return GpsCoordinates((cell_latitude + 0.5) * size, (cell_longitude + 0.5) * size)
+
+# Entries are keyed by provider as well as cell, since backends format the same
+# place differently and must not serve each other's addresses.
+class GeocodeCache:
+    def __init__(self, provider, path='geocode_cache.db', ttl_seconds=DEFAULT_TTL_SECONDS, pool=address_pool):
+        self.provider = provider
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.pool = pool
+        self.memory = {}
+        self.create_table()
+
+    def create_table(self):
+        with self.lock:
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(geocode_cache)')]
+            if columns and 'provider' not in columns:
+                # Older caches mixed providers and used coarser street cells, so they are rebuilt
+                self.connection.execute('DROP TABLE geocode_cache')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    provider TEXT,
+                    resolution TEXT,
+                    cell_latitude INTEGER,
+                    cell_longitude INTEGER,
+                    address TEXT,
+                    fetched_at REAL DEFAULT 0,
+                    details TEXT,
+                    PRIMARY KEY (provider, resolution, cell_latitude, cell_longitude)
+                )
+            ''')
+            if 'provider' in columns and 'details' not in columns:
+                self.connection.execute('ALTER TABLE geocode_cache ADD COLUMN details TEXT')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS geocode_cache_fetched_at ON geocode_cache (provider, fetched_at)')
+            self.connection.commit()
+
+    # Returns (address, stale); address is None on a miss
+    def lookup(self, coordinates, resolution):
+        key = (resolution,) + cell_for(coordinates.latitude, coordinates.longitude, resolution)
+        entry = self.memory.get(key)
+        if entry is None:
+            with self.lock:
+                row = self.connection.execute(
+                    'SELECT address, fetched_at, details FROM geocode_cache '
+                    'WHERE provider=? AND resolution=? AND cell_latitude=? AND cell_longitude=?',
+                    (self.provider,) + key).fetchone()
+            if row is None:
+                return None, False
+            entry = (self.pool.code(row[0], json.loads(row[2]) if row[2] else None), row[1])
+            self.memory[key] = entry
+        code, fetched_at = entry
+        return self.pool.address(code), time.time() - fetched_at > self.ttl_seconds
+
+    def get(self, coordinates, resolution):
+        return self.lookup(coordinates, resolution)[0]
+
+    def put(self, coordinates, resolution, address):
+        self.put_cell(resolution, cell_for(coordinates.latitude, coordinates.longitude, resolution), address)
+
+    def put_cell(self, resolution, cell, address):
+        key = (resolution,) + tuple(cell)
+        fetched_at = time.time()
+        code = self.pool.code(address)
+        self.memory[key] = (code, fetched_at)
+        details = self.pool.address_details(code)
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO geocode_cache (provider, resolution, cell_latitude, cell_longitude, address, fetched_at, details) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.provider,) + key + (address, fetched_at, json.dumps(details, ensure_ascii=False) if details else None))
+            self.connection.commit()
+
+    def cells(self, resolution):
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT cell_latitude, cell_longitude FROM geocode_cache WHERE provider=? AND resolution=?',
+                (self.provider, resolution)).fetchall()
+        return set(rows)
+
+    # Returns the n least recently fetched entries as (resolution, cell_latitude, cell_longitude)
+    def oldest(self, n):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT resolution, cell_latitude, cell_longitude FROM geocode_cache WHERE provider=? ORDER BY fetched_at LIMIT ?',
+                (self.provider, n)).fetchall()
@@ -0,0 +1,95 @@
+import time
+from address_pool import address_pool
+from file_io import set_category_column, write_table
+from gps_formatter import parse_coordinates
+from incremental import coordinate_fingerprint, save_manifest
+from reverse_geocoding_service import DEFAULT_RESOLUTION, GEOCODING_ERROR
+from tracing import NullTracer
+
+class GeocodingPipeline:
+    def __init__(self, service, cache=None, resolution=DEFAULT_RESOLUTION, tracer=None, max_retries=2, retry_delay=1.0,
+                 refresher=None, pool=address_pool):
+        self.service = service
+        self.cache = cache
+        self.refresher = refresher
+        self.resolution = resolution
+        self.tracer = tracer or NullTracer()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.pool = pool
+        self.results = {}
+
+    def geocode(self, coordinates, row=None):
+        if self.cache is not None:
+            with self.tracer.span('cache lookup', row) as span:
+                address, stale = self.cache.lookup(coordinates, self.resolution)
+                span['hit'] = address is not None
+                span['stale'] = stale
+            if address is not None:
+                # Stale entries are served as they are and refreshed in the background
+                if stale and self.refresher is not None:
+                    self.refresher.submit(coordinates, self.resolution)
+                return self.pool.code(address)
+        address = self.request(coordinates, row)
+        if self.cache is not None and address != GEOCODING_ERROR:
+            self.cache.put(coordinates, self.resolution, address)
+        return self.pool.code(address)
+
+    def request(self, coordinates, row=None):
+        address = self.send(coordinates, row)
+        attempt = 0
+        while address == GEOCODING_ERROR and attempt < self.max_retries:
+            attempt += 1
+            with self.tracer.span('retry', row, attempt=attempt):
+                time.sleep(self.retry_delay * attempt)
+                address = self.send(coordinates, row)
+        return address
+
+    def send(self, coordinates, row=None):
+        with self.tracer.span('queue wait', row):
+            self.service.rate_limiter.wait()
+        with self.tracer.span('backend request', row):
+            start = time.perf_counter()
+            address = self.service.get_address(coordinates, self.resolution)
+            self.service.latency.add(time.perf_counter() - start)
+            return address
+
+    # Returns one address code per input row; rows that cannot be parsed get the
+    # code of the empty address. on_row(index, code) is called for each geocoded row.
+    # Rows whose coordinate fingerprint is in previous_results reuse that address.
+    def run(self, gps_coordinates, on_row=None, previous_results=None):
+        previous_results = previous_results or {}
+        empty_code = self.pool.code("")
+        codes = [empty_code] * len(gps_coordinates)
+        self.results = {}
+        for index, gps_coordinate in enumerate(gps_coordinates):
+            with self.tracer.span('parse', index):
+                coordinates = parse_coordinates(gps_coordinate)
+                fingerprint = coordinate_fingerprint(coordinates) if coordinates is not None else None
+            if coordinates is None:
+                continue
+            address = previous_results.get(fingerprint)
+            if address is not None:
+                codes[index] = self.pool.code(address)
+            else:
+                codes[index] = self.geocode(coordinates, index)
+            self.results[fingerprint] = codes[index]
+            if on_row:
+                on_row(index, codes[index])
+        return codes
+
+    def write(self, table, codes, output_path, column_name='End Destination'):
+        with self.tracer.span('write', rows=len(codes)):
+            codes, categories = self.pool.compact(codes)
+            table = set_category_column(table, column_name, codes, categories)
+            write_table(table, output_path)
+            results = {fingerprint: self.pool.address(code) for fingerprint, code in self.results.items()
+                       if self.pool.address(code) != GEOCODING_ERROR}
+            save_manifest(output_path, self.resolution, self.service.provider, results)
+        return table
+
+    def close(self):
+        self.tracer.close()
+        close_service = getattr(self.service, 'close', None)
+        if close_service:
+            close_service()
@@ -0,0 +1,81 @@
+import logging
+import sqlite3
+import threading
+import googlemaps
+from address_pool import address_pool
+from rate_limiter import RateLimiter
+from latency_tracker import LatencyTracker
+from reverse_geocoding_service import DEFAULT_RESOLUTION, ADDRESS_NOT_FOUND, GEOCODING_ERROR
+
+# Replace 'YOUR_GOOGLE_MAPS_API_KEY' with your actual Google Maps API key
+GOOGLE_MAPS_API_KEY = 'YOUR_GOOGLE_MAPS_API_KEY'
+gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
+
+# Set up the SQLite database
+conn = sqlite3.connect('gps_coordinates.db', check_same_thread=False)
+db_lock = threading.Lock()
+c = conn.cursor()
+
+c.execute('''
+    CREATE TABLE IF NOT EXISTS coordinates (
+        id INTEGER PRIMARY KEY,
+        latitude REAL,
+        longitude REAL,
+        address TEXT
+    )
+''')
+conn.commit()
+
+# Google result_type filter for each supported resolution
+RESULT_TYPES = {
+    'building': None,
+    'street': 'route',
+    'suburb': 'sublocality',
+    'city': 'locality',
+}
+
+class GoogleGeocodingService:
+    provider = 'google'
+    rate_limiter = RateLimiter(50.0)
+    latency = LatencyTracker(0.2)
+    # Google Geocoding API list price in USD
+    cost_per_request = 0.005
+
+    # Cache refreshes pass check_local_db=False; the local database would only
+    # hand back the address the stale entry was made from.
+    def __init__(self, check_local_db=True):
+        self.check_local_db = check_local_db
+
+    def get_address(self, coordinates, resolution=DEFAULT_RESOLUTION):
+        # Check the local database first; it only holds building level addresses
+        if self.check_local_db and resolution == DEFAULT_RESOLUTION:
+            address = self.get_address_from_db(coordinates.latitude, coordinates.longitude)
+            if address:
+                return address
+
+        # If not found in the database, use the Google Maps API
+        try:
+            results = gmaps.reverse_geocode((coordinates.latitude, coordinates.longitude), result_type=RESULT_TYPES[resolution])
+            if results:
+                address = address_pool.intern(results[0]['formatted_address'])
+                if resolution == DEFAULT_RESOLUTION:
+                    self.save_coordinates_to_db(coordinates.latitude, coordinates.longitude, address)
+                return address
+            else:
+                return ADDRESS_NOT_FOUND
+        except Exception as e:
+            logging.error(f"Error during reverse geocoding: {e}")
+            return GEOCODING_ERROR
+
+    def get_address_from_db(self, latitude, longitude):
+        with db_lock:
+            c.execute("SELECT address FROM coordinates WHERE latitude=? AND longitude=?", (latitude, longitude))
+            result = c.fetchone()
+        return address_pool.intern(result[0]) if result else None
+
+    def save_coordinates_to_db(self, latitude, longitude, address):
+        with db_lock:
+            # A refreshed address replaces the one stored for the point
+            c.execute("DELETE FROM coordinates WHERE latitude=? AND longitude=?", (latitude, longitude))
+            c.execute("INSERT INTO coordinates (latitude, longitude, address) VALUES (?, ?, ?)", (latitude, longitude, address))
+            conn.commit()
@@ -22,3 +22,27 @@ class GpsFormatter:
             return float(coordinate + "000")
         else:
             return float(coordinate.ljust(5, '0'))
+
+def adjust_coordinates(gps_coordinate):
+    try:
+        latitude, lat_direction, longitude, lon_direction = gps_coordinate.split(',')
+        latitude = latitude.strip()
+        longitude = longitude.strip()
+
+        if lat_direction.strip().upper() == 'S':
+            latitude = '-' + latitude
+        if lon_direction.strip().upper() == 'W':
+            longitude = '-' + longitude
+
+        return latitude, longitude
+    except ValueError:
+        return None, None
+
+def parse_coordinates(gps_coordinate):
+    latitude, longitude = adjust_coordinates(gps_coordinate.strip())
+    if latitude is None or longitude is None:
+        return None
+    try:
+        return GpsCoordinates(float(latitude), float(longitude))
+    except ValueError:
+        return None
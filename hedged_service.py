@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from latency_tracker import LatencyTracker
+from rate_limiter import RateLimiter
+from reverse_geocoding_service import DEFAULT_RESOLUTION, GEOCODING_ERROR
+
+# Sends each request to the first backend and, if it has not answered within the
+# hedge_percentile latency it usually answers in, to the next backend as well.
+# The hedge timer starts once the backend has its rate limiter slot, since the
+# percentile only covers time on the network. The first good answer wins. A
+# losing request that is still waiting for its slot is dropped before it is
+# sent; one already on the network cannot be interrupted and is ignored.
+class HedgedGeocodingService:
+    def __init__(self, services, hedge_percentile=95, min_hedge_delay=0.05, max_workers=4):
+        self.services = services
+        self.provider = '+'.join(service.provider for service in services)
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        # Each backend call waits on that backend's own rate limiter
+        self.rate_limiter = RateLimiter(None)
+        self.latency = LatencyTracker(services[0].latency.default_latency)
+        self.cost_per_request = services[0].cost_per_request
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def hedge_delay(self, service):
+        return max(self.min_hedge_delay, service.latency.percentile(self.hedge_percentile))
+
+    # Returns None without sending anything when cancelled is set by the time
+    # the rate limiter slot comes up. sent_at[index] is set once the request goes out.
+    @staticmethod
+    def call(service, coordinates, resolution, index, cancelled, sent_at, progress):
+        service.rate_limiter.wait()
+        if cancelled.is_set():
+            return None
+        start = time.perf_counter()
+        sent_at[index] = start
+        progress.set()
+        address = service.get_address(coordinates, resolution)
+        service.latency.add(time.perf_counter() - start)
+        return address
+
+    def get_address(self, coordinates, resolution=DEFAULT_RESOLUTION):
+        with self.lock:
+            self.requests += 1
+        cancelled = threading.Event()
+        progress = threading.Event()
+        sent_at = {}
+        futures = {}
+        pending = set()
+        index = -1
+        while True:
+            hedge_now = not pending
+            if pending and index in sent_at:
+                hedge_now = time.perf_counter() >= sent_at[index] + self.hedge_delay(self.services[index])
+            if hedge_now and index + 1 < len(self.services):
+                index += 1
+                if index > 0:
+                    with self.lock:
+                        self.hedges_fired += 1
+                future = self.executor.submit(self.call, self.services[index], coordinates, resolution, index,
+                                              cancelled, sent_at, progress)
+                future.add_done_callback(lambda _: progress.set())
+                futures[future] = index
+                pending.add(future)
+            if not pending:
+                return GEOCODING_ERROR
+
+            # Woken when a request is sent or finishes; the timeout is the hedge deadline
+            timeout = None
+            if index in sent_at and index + 1 < len(self.services):
+                timeout = max(0.0, sent_at[index] + self.hedge_delay(self.services[index]) - time.perf_counter())
+            progress.wait(timeout)
+            progress.clear()
+
+            for future in [future for future in pending if future.done()]:
+                pending.discard(future)
+                try:
+                    address = future.result()
+                except Exception as e:
+                    # A backend that raises counts as a failed request and the next one is tried
+                    logging.error(f"Error from {self.services[futures[future]].provider} backend: {e}")
+                    continue
+                if address is not None and address != GEOCODING_ERROR:
+                    cancelled.set()
+                    for other in pending:
+                        other.cancel()
+                    if futures[future] > 0:
+                        with self.lock:
+                            self.hedges_won += 1
+                    return address
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for service in self.services:
+            close_service = getattr(service, 'close', None)
+            if close_service:
+                close_service()
+        logging.info(f"Hedged geocoding: {self.stats()}")
@@ -0,0 +1,30 @@
+import hashlib
+import json
+import os
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+def coordinate_fingerprint(coordinates):
+    key = f"{coordinates.latitude:.7f},{coordinates.longitude:.7f}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def manifest_path(output_path):
+    return output_path + MANIFEST_SUFFIX
+
+def save_manifest(output_path, resolution, provider, results):
+    with open(manifest_path(output_path), 'w', encoding='utf-8') as file:
+        json.dump({'resolution': resolution, 'provider': provider, 'results': results}, file, ensure_ascii=False)
+
+# Returns {fingerprint: address} from the previous run's manifest, provided it
+# was made at the same resolution by the same provider. Output files without a
+# manifest are not reused, since they do not record which backend produced them
+# and both the Nominatim and the Google front ends wrote the same file names.
+def load_previous_results(output_path, resolution, provider):
+    path = manifest_path(output_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        manifest = json.load(file)
+    if manifest.get('resolution') != resolution or manifest.get('provider') != provider:
+        return {}
+    return manifest['results']
@@ -0,0 +1,28 @@
+import collections
+import threading
+
+# Keeps the most recent request latencies of a backend. Until enough samples
+# have been seen, default_latency is used as the estimate.
+class LatencyTracker:
+    def __init__(self, default_latency, max_samples=1000):
+        self.default_latency = default_latency
+        self.samples = collections.deque(maxlen=max_samples)
+        self.lock = threading.Lock()
+
+    def add(self, latency):
+        with self.lock:
+            self.samples.append(latency)
+
+    def mean(self):
+        with self.lock:
+            if not self.samples:
+                return self.default_latency
+            return sum(self.samples) / len(self.samples)
+
+    def percentile(self, percent):
+        with self.lock:
+            if not self.samples:
+                return self.default_latency
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
@@ -1,33 +1,26 @@
 import pandas as pd
-import sqlite3
-import googlemaps
-from tkinter import Tk, filedialog, Label, Button, Entry, Toplevel, messagebox, PhotoImage, StringVar
+from tkinter import Tk, filedialog, Label, Button, Entry, Toplevel, messagebox, PhotoImage, StringVar, BooleanVar, Checkbutton
 from tkinter import ttk
 import threading
 import logging
+from file_io import FILE_DIALOG_TYPES, read_table, column_values, drop_blank_rows, output_file_path
+from geocoding_pipeline import GeocodingPipeline
+from gps_formatter import adjust_coordinates
+from geocode_cache import GeocodeCache
+from tracing import tracer_for
+from recording_service import recording_for, recording_mode, replaying, cache_for
+from cache_refresher import BackgroundRefresher
+from incremental import load_previous_results
+from planner import plan_file, format_plan
+from warmup import CacheWarmer, cells_for_file
+from reverse_geocoding_service import DEFAULT_RESOLUTION
+from google_geocoding_service import GoogleGeocodingService, RESULT_TYPES
+from backends import backend_priority, create_service, create_background_service, service_provider
 
 # Configure logging
 logging.basicConfig(filename='gps_reverse_geocoder.log', level=logging.INFO, 
                     format='%(asctime)s:%(levelname)s:%(message)s')
 
-# Replace 'YOUR_GOOGLE_MAPS_API_KEY' with your actual Google Maps API key
-GOOGLE_MAPS_API_KEY = 'YOUR_GOOGLE_MAPS_API_KEY'
-gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-
-# Set up the SQLite database
-conn = sqlite3.connect('gps_coordinates.db')
-c = conn.cursor()
-
-c.execute('''
-    CREATE TABLE IF NOT EXISTS coordinates (
-        id INTEGER PRIMARY KEY,
-        latitude REAL,
-        longitude REAL,
-        address TEXT
-    )
-''')
-conn.commit()
-
 class GpsCoordinates:
     def __init__(self, latitude, longitude):
         self.latitude = latitude
@@ -45,95 +38,109 @@ class GpsFormatter:
     def format_coordinate(coordinate):
         return float(coordinate.strip())
 
-class ReverseGeocodingService:
-    def get_address(self, coordinates):
-        # Check the local database first
-        address = self.get_address_from_db(coordinates.latitude, coordinates.longitude)
-        if address:
-            return address
-
-        # If not found in the database, use the Google Maps API
-        try:
-            results = gmaps.reverse_geocode((coordinates.latitude, coordinates.longitude))
-            if results:
-                address = results[0]['formatted_address']
-                self.save_coordinates_to_db(coordinates.latitude, coordinates.longitude, address)
-                return address
-            else:
-                return "Address not found"
-        except Exception as e:
-            logging.error(f"Error during reverse geocoding: {e}")
-            return "Error during reverse geocoding"
-
-    def get_address_from_db(self, latitude, longitude):
-        c.execute("SELECT address FROM coordinates WHERE latitude=? AND longitude=?", (latitude, longitude))
-        result = c.fetchone()
-        return result[0] if result else None
-
-    def save_coordinates_to_db(self, latitude, longitude, address):
-        c.execute("INSERT INTO coordinates (latitude, longitude, address) VALUES (?, ?, ?)", (latitude, longitude, address))
-        conn.commit()
-
-def adjust_coordinates(gps_coordinate):
-    try:
-        latitude, lat_direction, longitude, lon_direction = gps_coordinate.split(',')
-        latitude = latitude.strip()
-        longitude = longitude.strip()
-
-        if lat_direction.strip().upper() == 'S':
-            latitude = '-' + latitude
-        if lon_direction.strip().upper() == 'W':
-            longitude = '-' + longitude
-
-        return latitude, longitude
-    except ValueError:
-        return None, None
+# Backends in priority order: Google alone unless GPS_FORMATTER_BACKENDS lists more
+BACKEND_PRIORITY = backend_priority(GoogleGeocodingService.provider)
+geocode_cache = GeocodeCache(service_provider(BACKEND_PRIORITY))
 
 def process_coordinates(latitude, longitude):
     formatter = GpsFormatter()
     coordinates = formatter.build_coordinates(latitude, longitude)
-    reverse_geocoding_service = ReverseGeocodingService()
+    reverse_geocoding_service = GoogleGeocodingService()
     address = reverse_geocoding_service.get_address(coordinates)
     return address
 
+cache_warmer = None
+# Recorded and replayed runs must not touch the network in the background
+cache_refresher = None if recording_mode() else BackgroundRefresher(create_background_service(BACKEND_PRIORITY), geocode_cache)
+
 def select_file():
     file_path = filedialog.askopenfilename(
-        title="Select Excel File",
-        filetypes=(("Excel files", "*.xlsx"), ("All files", "*.*"))
+        title="Select Data File",
+        filetypes=FILE_DIALOG_TYPES
     )
     if file_path:
-        threading.Thread(target=process_file, args=(file_path,)).start()
+        threading.Thread(target=process_file, args=(file_path, resolution_var.get(), incremental_var.get())).start()
+
+def select_plan_file():
+    file_path = filedialog.askopenfilename(
+        title="Select Data File",
+        filetypes=FILE_DIALOG_TYPES
+    )
+    if not file_path:
+        return
+    result_label.config(text="Planning...")
+    threading.Thread(target=plan_data_file, args=(file_path, resolution_var.get(), incremental_var.get())).start()
+
+def plan_data_file(file_path, resolution=DEFAULT_RESOLUTION, incremental=False):
+    try:
+        previous_results = load_previous_results(output_file_path(file_path), resolution, service_provider(BACKEND_PRIORITY)) if incremental else None
+        plan = plan_file(file_path, recording_for(create_service(BACKEND_PRIORITY)), cache_for(geocode_cache), resolution, previous_results)
+        result_label.config(text=format_plan(plan))
+        logging.info(f"Plan for {file_path}: {plan}")
+    except FileNotFoundError:
+        messagebox.showerror("Error", "The selected file was not found.")
+        logging.error("The selected file was not found.")
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {e}")
+        logging.error(f"Error planning file: {e}")
+
+def select_warm_up_file():
+    file_path = filedialog.askopenfilename(
+        title="Select Data File",
+        filetypes=FILE_DIALOG_TYPES
+    )
+    if not file_path:
+        return
+    if recording_mode():
+        result_label.config(text="Cache warm-up is disabled while recording or replaying")
+        return
+    result_label.config(text="Finding cells to warm up...")
+    threading.Thread(target=warm_up_file, args=(file_path, resolution_var.get())).start()
+
+def warm_up_file(file_path, resolution=DEFAULT_RESOLUTION):
+    global cache_warmer
+    try:
+        if cache_warmer is not None:
+            cache_warmer.stop()
+        cells = cells_for_file(file_path, resolution)
+        cache_warmer = CacheWarmer(create_background_service(BACKEND_PRIORITY), geocode_cache, resolution, cells).start()
+        result_label.config(text=f"Warming {len(cache_warmer.cells)} uncached {resolution} cells in the background")
+        logging.info(f"Warming {len(cache_warmer.cells)} uncached {resolution} cells from {file_path}")
+    except FileNotFoundError:
+        messagebox.showerror("Error", "The selected file was not found.")
+        logging.error("The selected file was not found.")
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {e}")
+        logging.error(f"Error warming cache: {e}")
 
-def process_file(file_path):
+def process_file(file_path, resolution=DEFAULT_RESOLUTION, incremental=False):
     try:
         start_loading_animation()
-        df = pd.read_excel(file_path)
+        table = read_table(file_path)
         
         # Drop rows where 'GPS Co-ordinates' is NaN or empty
-        df = df.dropna(subset=['GPS Co-ordinates'])
-        df = df[df['GPS Co-ordinates'].str.strip() != '']
+        table = drop_blank_rows(table, 'GPS Co-ordinates')
 
-        df['GPS Co-ordinates'] = df['GPS Co-ordinates'].astype(str)
-        df['End Destination'] = ""
+        gps_coordinates = column_values(table, 'GPS Co-ordinates')
 
-        total_rows = len(df)
+        total_rows = len(gps_coordinates)
         progress_bar['maximum'] = total_rows
 
-        for index, row in df.iterrows():
-            gps_coordinate = str(row['GPS Co-ordinates']).strip()
-            latitude, longitude = adjust_coordinates(gps_coordinate)
-            if latitude is None or longitude is None:
-                continue
-            address = process_coordinates(latitude, longitude)
-            df.at[index, 'End Destination'] = address
-
+        def on_row(index, code):
             progress_bar['value'] = index + 1
             root.update_idletasks()
 
-        output_file_path = file_path.replace(".xlsx", "_with_end_destinations.xlsx")
-        df.to_excel(output_file_path, index=False)
-        result_label.config(text=f"Updated Excel file saved to: {output_file_path}")
-        logging.info(f"Updated Excel file saved to: {output_file_path}")
+        output_path = output_file_path(file_path)
+        previous_results = load_previous_results(output_path, resolution, service_provider(BACKEND_PRIORITY)) if incremental else None
+        pipeline = GeocodingPipeline(recording_for(create_service(BACKEND_PRIORITY)), cache_for(geocode_cache), resolution, tracer_for(output_path),
+                                     max_retries=0 if replaying() else 2, refresher=cache_refresher)
+        try:
+            codes = pipeline.run(gps_coordinates, on_row, previous_results)
+            pipeline.write(table, codes, output_path)
+        finally:
+            pipeline.close()
+        result_label.config(text=f"Updated file saved to: {output_path}")
+        logging.info(f"Updated file saved to: {output_path}")
     except pd.errors.EmptyDataError:
         messagebox.showerror("Error", "The selected file is empty.")
         logging.error("The selected file is empty.")
@@ -207,7 +214,15 @@ logo_image = PhotoImage(file=logo_path)
 logo_label = Label(root, image=logo_image, bg='#ffffff')
 logo_label.pack(pady=10)
 
-Button(root, text="Select Excel File", command=select_file, bg='#09a3a3', fg='white', font=('Arial', 12)).pack(pady=10)
+resolution_var = StringVar()
+resolution_var.set(DEFAULT_RESOLUTION)
+ttk.Combobox(root, textvariable=resolution_var, values=list(RESULT_TYPES), state="readonly").pack(pady=10)
+incremental_var = BooleanVar()
+Checkbutton(root, text="Only geocode new or changed rows", variable=incremental_var, bg='#ffffff', font=('Arial', 12)).pack(pady=5)
+
+Button(root, text="Select Data File", command=select_file, bg='#09a3a3', fg='white', font=('Arial', 12)).pack(pady=10)
+Button(root, text="Plan Data File", command=select_plan_file, bg='#09a3a3', fg='white', font=('Arial', 12)).pack(pady=10)
+Button(root, text="Warm Up Cache From File", command=select_warm_up_file, bg='#09a3a3', fg='white', font=('Arial', 12)).pack(pady=10)
 Button(root, text="Enter GPS Manually", command=open_manual_entry_window, bg='#09a3a3', fg='white', font=('Arial', 12)).pack(pady=10)
 
 progress_bar = ttk.Progressbar(root, orient="horizontal", length=300, mode="determinate", style="TProgressbar")
@@ -1,10 +1,22 @@
 import pandas as pd
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox, QVBoxLayout, QLineEdit, QLabel, QPushButton, QProgressBar
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 import sys
 import threading
+from file_io import FILE_DIALOG_FILTER, read_table, column_values, output_file_path
+from address_pool import address_pool
+from geocoding_pipeline import GeocodingPipeline
+from gps_formatter import adjust_coordinates
+from reverse_geocoding_service import ReverseGeocodingService, RESOLUTIONS, DEFAULT_RESOLUTION
+from geocode_cache import GeocodeCache
+from tracing import tracer_for
+from recording_service import recording_for, recording_mode, replaying, cache_for
+from cache_refresher import BackgroundRefresher
+from results_model import ResultsTableModel
+from incremental import load_previous_results
+from planner import plan_file, format_plan
+from warmup import CacheWarmer, cells_for_file
+from backends import backend_priority, create_service, create_background_service, service_provider
 from collections import Counter
 
 class GpsCoordinates:
@@ -26,56 +38,59 @@ class GpsFormatter:
             return float(coordinate.strip())
         return float(coordinate)
 
-class ReverseGeocodingService:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="gps_formatter")
-
-    def get_address(self, coordinates):
-        try:
-            location = self.geolocator.reverse((coordinates.latitude, coordinates.longitude), exactly_one=True, zoom=18)
-            return location.address if location else "Address not found"
-        except (GeocoderTimedOut, GeocoderServiceError) as e:
-            print(f"Error during reverse geocoding: {e}")
-            return "Error during reverse geocoding"
-
-def adjust_coordinates(gps_coordinate):
-    try:
-        latitude, lat_direction, longitude, lon_direction = gps_coordinate.split(',')
-        latitude = latitude.strip()
-        longitude = longitude.strip()
-
-        if lat_direction.strip().upper() == 'S':
-            latitude = '-' + latitude
-        if lon_direction.strip().upper() == 'W':
-            longitude = '-' + longitude
-
-        return latitude, longitude
-    except ValueError:
-        return None, None
-
 def process_coordinates(latitude, longitude):
     formatter = GpsFormatter()
     coordinates = formatter.build_coordinates(latitude, longitude)
-    reverse_geocoding_service = ReverseGeocodingService()
+    reverse_geocoding_service = ReverseGeocodingService(address_details=True)
     address = reverse_geocoding_service.get_address(coordinates)
     return address
 
+# Nominatim address components naming the suburb and the city, most specific first.
+# Batches here ask Nominatim for address details so rows can be grouped by them.
+SUBURB_KEYS = ('suburb', 'neighbourhood', 'quarter')
+CITY_KEYS = ('city', 'town', 'village', 'municipality')
+
 class DataAnalyzer:
     def __init__(self):
         self.data = []
 
     def add_entry(self, gps_coordinate, address):
-        self.data.append((gps_coordinate, address))
+        self.add_code(gps_coordinate, address_pool.code(address))
+
+    def add_code(self, gps_coordinate, code):
+        self.data.append((gps_coordinate, code))
+
+    # Counts rows per component code (the first of keys the address has),
+    # working over the distinct address codes rather than every row
+    @staticmethod
+    def most_common_component(address_counter, keys):
+        component_counter = Counter()
+        for code, count in address_counter.items():
+            for key in keys:
+                component_code = address_pool.component_code(code, key)
+                if component_code is not None:
+                    component_counter[component_code] += count
+                    break
+        if not component_counter:
+            return ("None", 0)
+        code, count = component_counter.most_common(1)[0]
+        return (address_pool.address(code), count)
 
     def analyze_data(self):
-        addresses = [entry[1] for entry in self.data]
-        address_counter = Counter(addresses)
-        most_common_address = address_counter.most_common(1)[0] if address_counter else ("None", 0)
+        codes = [entry[1] for entry in self.data]
+        address_counter = Counter(codes)
+        if address_counter:
+            code, count = address_counter.most_common(1)[0]
+            most_common_address = (address_pool.address(code), count)
+        else:
+            most_common_address = ("None", 0)
         unique_addresses = len(address_counter)
         return {
             "total_entries": len(self.data),
             "unique_addresses": unique_addresses,
-            "most_common_address": most_common_address
+            "most_common_address": most_common_address,
+            "most_common_suburb": self.most_common_component(address_counter, SUBURB_KEYS),
+            "most_common_city": self.most_common_component(address_counter, CITY_KEYS)
         }
 
 class SplashScreen(QtWidgets.QSplashScreen):
@@ -91,6 +106,12 @@ class SplashScreen(QtWidgets.QSplashScreen):
 class MainWindow(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
+        # Backends in priority order: Nominatim alone unless GPS_FORMATTER_BACKENDS lists more
+        self.backends = backend_priority(ReverseGeocodingService.provider)
+        self.geocode_cache = GeocodeCache(service_provider(self.backends))
+        self.cache_warmer = None
+        # Recorded and replayed runs must not touch the network in the background
+        self.cache_refresher = None if recording_mode() else BackgroundRefresher(create_background_service(self.backends, address_details=True), self.geocode_cache)
         self.data_analyzer = DataAnalyzer()
         self.showSplashScreen()
         self.initUI()
@@ -152,9 +173,21 @@ class MainWindow(QtWidgets.QWidget):
         file_block = QtWidgets.QWidget(self)
         file_block_layout = QtWidgets.QVBoxLayout(file_block)
         file_block.setStyleSheet("background-color: #eaeaea; padding: 0px; border-radius: 10px; text-align: center;")
-        self.selectFileButton = QPushButton('Select Excel File', self)
+        self.resolutionComboBox = QtWidgets.QComboBox(self)
+        self.resolutionComboBox.addItems(list(RESOLUTIONS))
+        self.resolutionComboBox.setCurrentText(DEFAULT_RESOLUTION)
+        file_block_layout.addWidget(self.resolutionComboBox)
+        self.incrementalCheckBox = QtWidgets.QCheckBox('Only geocode new or changed rows', self)
+        file_block_layout.addWidget(self.incrementalCheckBox)
+        self.selectFileButton = QPushButton('Select Data File', self)
         self.selectFileButton.clicked.connect(self.select_file)
         file_block_layout.addWidget(self.selectFileButton)
+        self.planFileButton = QPushButton('Plan Data File', self)
+        self.planFileButton.clicked.connect(self.select_plan_file)
+        file_block_layout.addWidget(self.planFileButton)
+        self.warmUpButton = QPushButton('Warm Up Cache From File', self)
+        self.warmUpButton.clicked.connect(self.select_warm_up_file)
+        file_block_layout.addWidget(self.warmUpButton)
         layout.addWidget(file_block)
         layout.addSpacing(10)
 
@@ -181,6 +214,22 @@ class MainWindow(QtWidgets.QWidget):
         self.analysisResultLabel.setWordWrap(True)
         layout.addWidget(self.analysisResultLabel)
 
+        # Results table
+        self.resultsFilterEntry = QtWidgets.QLineEdit(self)
+        self.resultsFilterEntry.setPlaceholderText('Filter results by address')
+        layout.addWidget(self.resultsFilterEntry)
+        self.resultsModel = ResultsTableModel(self)
+        self.resultsFilterEntry.textChanged.connect(self.resultsModel.set_filter)
+        self.resultsView = QtWidgets.QTableView(self)
+        self.resultsView.setModel(self.resultsModel)
+        self.resultsView.setSortingEnabled(True)
+        # Enabling sorting applies the header's default descending indicator; start in row order
+        self.resultsView.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.resultsView.verticalHeader().setVisible(False)
+        self.resultsView.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.resultsView.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.resultsView, 1)
+
         self.setLayout(layout)
 
         self.setStyleSheet("""
@@ -234,37 +283,82 @@ class MainWindow(QtWidgets.QWidget):
         self.move(qr.topLeft())
 
     def select_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, 'Select Excel File', '', 'Excel Files (*.xlsx);;All Files (*)')
+        file_path, _ = QFileDialog.getOpenFileName(self, 'Select Data File', '', FILE_DIALOG_FILTER)
         if file_path:
-            threading.Thread(target=self.process_file, args=(file_path,)).start()
+            resolution = self.resolutionComboBox.currentText()
+            incremental = self.incrementalCheckBox.isChecked()
+            self.resultsModel.clear()
+            threading.Thread(target=self.process_file, args=(file_path, resolution, incremental)).start()
+
+    def select_plan_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, 'Select Data File', '', FILE_DIALOG_FILTER)
+        if not file_path:
+            return
+        resolution = self.resolutionComboBox.currentText()
+        incremental = self.incrementalCheckBox.isChecked()
+        self.resultLabel.setText("Planning...")
+        threading.Thread(target=self.plan_data_file, args=(file_path, resolution, incremental)).start()
+
+    def plan_data_file(self, file_path, resolution=DEFAULT_RESOLUTION, incremental=False):
+        try:
+            previous_results = load_previous_results(output_file_path(file_path), resolution, service_provider(self.backends)) if incremental else None
+            plan = plan_file(file_path, recording_for(create_service(self.backends)), cache_for(self.geocode_cache), resolution, previous_results)
+            self.resultLabel.setText(format_plan(plan))
+        except FileNotFoundError:
+            QMessageBox.critical(self, "Error", "The selected file was not found.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred: {e}")
 
-    def process_file(self, file_path):
+    def select_warm_up_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, 'Select Data File', '', FILE_DIALOG_FILTER)
+        if not file_path:
+            return
+        if recording_mode():
+            self.resultLabel.setText("Cache warm-up is disabled while recording or replaying")
+            return
+        resolution = self.resolutionComboBox.currentText()
+        self.resultLabel.setText("Finding cells to warm up...")
+        threading.Thread(target=self.warm_up_file, args=(file_path, resolution)).start()
+
+    def warm_up_file(self, file_path, resolution=DEFAULT_RESOLUTION):
+        try:
+            if self.cache_warmer is not None:
+                self.cache_warmer.stop()
+            cells = cells_for_file(file_path, resolution)
+            self.cache_warmer = CacheWarmer(create_background_service(self.backends, address_details=True), self.geocode_cache, resolution, cells).start()
+            self.resultLabel.setText(f"Warming {len(self.cache_warmer.cells)} uncached {resolution} cells in the background")
+        except FileNotFoundError:
+            QMessageBox.critical(self, "Error", "The selected file was not found.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred: {e}")
+
+    def process_file(self, file_path, resolution=DEFAULT_RESOLUTION, incremental=False):
         try:
             self.start_loading_animation()
             self.loadingLabel.setText("Loading...")
-            df = pd.read_excel(file_path)
+            table = read_table(file_path)
 
-            df['GPS Co-ordinates'] = df['GPS Co-ordinates'].astype(str)
-            df['End Destination'] = ""
+            gps_coordinates = column_values(table, 'GPS Co-ordinates')
 
-            total_rows = len(df)
+            total_rows = len(gps_coordinates)
             self.progressBar.setMaximum(total_rows)
 
-            for index, row in df.iterrows():
-                gps_coordinate = str(row['GPS Co-ordinates']).strip()
-                latitude, longitude = adjust_coordinates(gps_coordinate)
-                if latitude is None or longitude is None:
-                    continue
-                address = process_coordinates(latitude, longitude)
-                df.at[index, 'End Destination'] = address
-                self.data_analyzer.add_entry(gps_coordinate, address)
-
+            def on_row(index, code):
+                self.resultsModel.append(index + 1, gps_coordinates[index], code)
+                self.data_analyzer.add_code(gps_coordinates[index], code)
                 self.progressBar.setValue(index + 1)
                 QtCore.QCoreApplication.processEvents()
 
-            output_file_path = file_path.replace(".xlsx", "_with_end_destinations.xlsx")
-            df.to_excel(output_file_path, index=False)
-            self.resultLabel.setText(f"Updated Excel file saved to: {output_file_path}")
+            output_path = output_file_path(file_path)
+            previous_results = load_previous_results(output_path, resolution, service_provider(self.backends)) if incremental else None
+            pipeline = GeocodingPipeline(recording_for(create_service(self.backends, address_details=True)), cache_for(self.geocode_cache), resolution, tracer_for(output_path),
+                                         max_retries=0 if replaying() else 2, refresher=self.cache_refresher)
+            try:
+                codes = pipeline.run(gps_coordinates, on_row, previous_results)
+                pipeline.write(table, codes, output_path)
+            finally:
+                pipeline.close()
+            self.resultLabel.setText(f"Updated file saved to: {output_path}")
             self.display_analysis_results()
         except pd.errors.EmptyDataError:
             QMessageBox.critical(self, "Error", "The selected file is empty.")
@@ -322,7 +416,11 @@ class MainWindow(QtWidgets.QWidget):
             f"Total Entries: {analysis_results['total_entries']}\n"
             f"Unique Addresses: {analysis_results['unique_addresses']}\n"
             f"Most Common Address: {analysis_results['most_common_address'][0]} "
-            f"({analysis_results['most_common_address'][1]} times)"
+            f"({analysis_results['most_common_address'][1]} times)\n"
+            f"Most Common Suburb: {analysis_results['most_common_suburb'][0]} "
+            f"({analysis_results['most_common_suburb'][1]} times)\n"
+            f"Most Common City: {analysis_results['most_common_city'][0]} "
+            f"({analysis_results['most_common_city'][1]} times)"
         )
         self.analysisResultLabel.setText(analysis_text)
 
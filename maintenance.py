@@ -0,0 +1,71 @@
+import argparse
+from cache_refresher import refresh_oldest
+from geocode_cache import GeocodeCache
+from reverse_geocoding_service import RESOLUTIONS, DEFAULT_RESOLUTION
+from warmup import CacheWarmer, cells_for_bbox, cells_for_polygon, cells_for_file
+from backends import BACKEND_NAMES, create_backend
+
+def refresh_command(args):
+    cache = GeocodeCache(args.backend, args.cache)
+    refreshed = refresh_oldest(create_backend(args.backend, background=True), cache, args.count)
+    print(f"Refreshed {refreshed} of the {args.count} oldest cache entries")
+
+def parse_polygon(text):
+    points = []
+    for point in text.split(';'):
+        values = point.split(',')
+        if len(values) != 2:
+            raise ValueError(f"Polygon point '{point}' is not lat,lon")
+        points.append((float(values[0]), float(values[1])))
+    if len(points) < 3:
+        raise ValueError("A polygon needs at least three points")
+    return points
+
+# Areas are warmed at suburb level unless asked otherwise; building and street
+# cells are too small to cover more than a few city blocks
+AREA_RESOLUTION = 'suburb'
+
+def warmup_command(args):
+    if args.resolution is None:
+        args.resolution = DEFAULT_RESOLUTION if args.file else AREA_RESOLUTION
+    try:
+        if args.bbox:
+            cells = cells_for_bbox(*args.bbox, args.resolution)
+        elif args.polygon:
+            cells = cells_for_polygon(parse_polygon(args.polygon), args.resolution)
+        else:
+            cells = cells_for_file(args.file, args.resolution)
+    except ValueError as e:
+        args.parser.error(str(e))
+    cache = GeocodeCache(args.backend, args.cache)
+    # Nothing else is using the backend, so the warm-up takes its full rate
+    warmer = CacheWarmer(create_backend(args.backend, background=True), cache, args.resolution, cells, args.max_cells, share=1.0)
+    print(f"Warming {len(warmer.cells)} uncached cells of {len(cells)} at {args.resolution} resolution")
+    warmer.start().join()
+    print(f"Warmed {warmer.warmed} cells")
+
+def main():
+    parser = argparse.ArgumentParser(description='Reverse geocode cache maintenance')
+    parser.add_argument('--cache', default='geocode_cache.db', help='path to the geocode cache database')
+    parser.add_argument('--backend', choices=BACKEND_NAMES, default='nominatim', help='backend whose cache entries to work on')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    refresh_parser = subparsers.add_parser('refresh', help='re-query the oldest cache entries')
+    refresh_parser.add_argument('count', type=int, help='number of entries to refresh')
+    refresh_parser.set_defaults(func=refresh_command)
+
+    warmup_parser = subparsers.add_parser('warmup', help='pre-populate the cache for an area or a file')
+    area = warmup_parser.add_mutually_exclusive_group(required=True)
+    area.add_argument('--bbox', type=float, nargs=4, metavar=('SOUTH', 'WEST', 'NORTH', 'EAST'), help='bounding box in degrees')
+    area.add_argument('--polygon', help='polygon as "lat,lon;lat,lon;..."')
+    area.add_argument('--file', help='input file whose coordinates to warm')
+    warmup_parser.add_argument('--resolution', choices=list(RESOLUTIONS),
+                               help=f"defaults to {AREA_RESOLUTION} for --bbox and --polygon, {DEFAULT_RESOLUTION} for --file")
+    warmup_parser.add_argument('--max-cells', type=int, default=10000, help='warm at most this many of the densest cells')
+    warmup_parser.set_defaults(func=warmup_command, parser=warmup_parser)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
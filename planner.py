@@ -0,0 +1,67 @@
+from collections import Counter
+from file_io import read_table, column_values
+from geocode_cache import cell_for
+from gps_formatter import parse_coordinates
+from incremental import coordinate_fingerprint
+from reverse_geocoding_service import DEFAULT_RESOLUTION
+
+# Works out what a batch run would do without making any network calls. Each
+# distinct coordinate string is parsed once, so a million-row file with a few
+# thousand distinct positions plans in about the time it takes to read it.
+def plan_file(file_path, service, cache=None, resolution=DEFAULT_RESOLUTION, previous_results=None):
+    table = read_table(file_path)
+    counts = Counter(gps_coordinate.strip() for gps_coordinate in column_values(table, 'GPS Co-ordinates'))
+    previous_results = previous_results or {}
+
+    invalid_rows = 0
+    reused_rows = 0
+    coordinates_seen = set()
+    cell_rows = Counter()
+    for gps_coordinate, count in counts.items():
+        coordinates = parse_coordinates(gps_coordinate)
+        if coordinates is None:
+            invalid_rows += count
+            continue
+        coordinates_seen.add((coordinates.latitude, coordinates.longitude))
+        if previous_results and coordinate_fingerprint(coordinates) in previous_results:
+            reused_rows += count
+            continue
+        cell_rows[cell_for(coordinates.latitude, coordinates.longitude, resolution)] += count
+
+    total_rows = sum(counts.values())
+    rows_to_geocode = sum(cell_rows.values())
+    if cache is None:
+        cached_cells = set()
+        backend_calls = rows_to_geocode
+    else:
+        # The first lookup in a cell fills the cache for every later row in it
+        cached_cells = cache.cells(resolution) & set(cell_rows)
+        backend_calls = len(cell_rows) - len(cached_cells)
+    cache_hits = rows_to_geocode - backend_calls
+
+    interval = 1.0 / service.rate_limiter.requests_per_second if service.rate_limiter.requests_per_second else 0.0
+    latency = service.latency.mean()
+    return {
+        "total_rows": total_rows,
+        "invalid_rows": invalid_rows,
+        "unique_coordinates": len(coordinates_seen),
+        "unique_cells": len(cell_rows),
+        "reused_rows": reused_rows,
+        "cache_hits": cache_hits,
+        "backend_calls": backend_calls,
+        "estimated_seconds": backend_calls * max(interval, latency),
+        "estimated_cost": backend_calls * service.cost_per_request,
+    }
+
+def format_plan(plan):
+    minutes, seconds = divmod(int(plan['estimated_seconds']), 60)
+    hours, minutes = divmod(minutes, 60)
+    return (
+        f"Total Rows: {plan['total_rows']} ({plan['invalid_rows']} invalid)\n"
+        f"Unique Coordinates: {plan['unique_coordinates']}\n"
+        f"Reused From Previous Run: {plan['reused_rows']}\n"
+        f"Expected Cache Hits: {plan['cache_hits']}\n"
+        f"Backend Calls: {plan['backend_calls']}\n"
+        f"Estimated Time: {hours}h {minutes:02d}m {seconds:02d}s\n"
+        f"Estimated Cost: ${plan['estimated_cost']:.2f}"
+    )
@@ -0,0 +1,20 @@
+import threading
+import time
+
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        self.requests_per_second = requests_per_second
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    # Blocks until the next request slot and returns how long it waited
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
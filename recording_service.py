@@ -0,0 +1,109 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from address_pool import address_pool
+from geocode_cache import GeocodeCache
+from latency_tracker import LatencyTracker
+from rate_limiter import RateLimiter
+from reverse_geocoding_service import DEFAULT_RESOLUTION, GEOCODING_ERROR
+
+RECORD = 'record'
+REPLAY = 'replay'
+REPLAY_WITH_LATENCY = 'replay_latency'
+MODES = (RECORD, REPLAY, REPLAY_WITH_LATENCY)
+
+RECORDING_ENV_VAR = 'GPS_FORMATTER_RECORDING'
+RECORDING_FILE_ENV_VAR = 'GPS_FORMATTER_RECORDING_FILE'
+DEFAULT_RECORDING_FILE = 'geocoding_recording.jsonl.gz'
+
+# Wraps any service with a get_address(coordinates, resolution) method. In record
+# mode every request and response is appended to a gzipped JSON lines file; in the
+# replay modes responses are served from that file without touching the network.
+class RecordingGeocodingService:
+    def __init__(self, service, path=DEFAULT_RECORDING_FILE, mode=RECORD):
+        if mode not in MODES:
+            raise ValueError(f"Unknown recording mode: {mode}")
+        self.service = service
+        self.provider = service.provider
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.file = None
+        self.responses = {}
+        self.latency = service.latency if mode == RECORD else LatencyTracker(0.0)
+        if mode == REPLAY:
+            self.rate_limiter = RateLimiter(None)
+        else:
+            self.rate_limiter = service.rate_limiter
+        self.cost_per_request = service.cost_per_request if mode == RECORD else 0.0
+        if mode != RECORD:
+            self.load()
+
+    @staticmethod
+    def key(coordinates, resolution):
+        return resolution, round(coordinates.latitude, 7), round(coordinates.longitude, 7)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise ValueError(f"No recording at {self.path}; record one first or point {RECORDING_FILE_ENV_VAR} at it")
+        with gzip.open(self.path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                # Lines recorded before address details were kept have no sixth field
+                resolution, latitude, longitude, address, latency, details = (json.loads(line) + [None])[:6]
+                self.responses[(resolution, latitude, longitude)] = (address_pool.intern(address, details), latency)
+
+    def get_address(self, coordinates, resolution=DEFAULT_RESOLUTION):
+        key = self.key(coordinates, resolution)
+        if self.mode == RECORD:
+            start = time.perf_counter()
+            address = self.service.get_address(coordinates, resolution)
+            self.save(key, address, time.perf_counter() - start)
+            return address
+
+        response = self.responses.get(key)
+        if response is None:
+            logging.warning(f"No recorded response for {key}")
+            return GEOCODING_ERROR
+        address, latency = response
+        if self.mode == REPLAY_WITH_LATENCY:
+            time.sleep(latency)
+        return address
+
+    def save(self, key, address, latency):
+        details = address_pool.address_details(address_pool.code(address))
+        line = json.dumps([key[0], key[1], key[2], address, round(latency, 4), details], ensure_ascii=False)
+        with self.lock:
+            if self.file is None:
+                self.file = gzip.open(self.path, 'at', encoding='utf-8')
+            self.file.write(line + '\n')
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+# Set GPS_FORMATTER_RECORDING to record, replay or replay_latency to wrap the
+# batch backend; GPS_FORMATTER_RECORDING_FILE overrides the recording path.
+def recording_mode():
+    return os.environ.get(RECORDING_ENV_VAR)
+
+def replaying():
+    return recording_mode() in (REPLAY, REPLAY_WITH_LATENCY)
+
+# Recorded and replayed runs use a fresh in-memory cache instead of the persistent
+# one, so a recording holds every request of the run and a replay depends on the
+# recording alone, while repeated cells are still answered without the backend.
+def cache_for(cache):
+    if not recording_mode():
+        return cache
+    return GeocodeCache(cache.provider, ':memory:', cache.ttl_seconds, cache.pool)
+
+def recording_for(service):
+    mode = recording_mode()
+    if not mode:
+        return service
+    return RecordingGeocodingService(service, os.environ.get(RECORDING_FILE_ENV_VAR, DEFAULT_RECORDING_FILE), mode)
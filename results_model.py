@@ -0,0 +1,149 @@
+import bisect
+import heapq
+import threading
+from PyQt5 import QtCore
+from address_pool import address_pool
+
+# Table model over the rows a batch has geocoded so far. Worker threads call
+# append(); rows are buffered and handed to the view in chunks by a timer on the
+# GUI thread. Only row numbers, coordinate strings and address codes are kept,
+# and the view asks for the rows it is drawing, so a million rows stay cheap.
+# Filtering and sorting on the address column work on the few distinct address
+# codes rather than on every row's string.
+class ResultsTableModel(QtCore.QAbstractTableModel):
+    HEADERS = ('Row', 'GPS Co-ordinates', 'End Destination')
+
+    def __init__(self, parent=None, pool=address_pool, flush_interval=200):
+        super().__init__(parent)
+        self.pool = pool
+        self.lock = threading.Lock()
+        self.pending = []
+        self.row_numbers = []
+        self.gps_coordinates = []
+        self.codes = []
+        self.code_set = set()
+        self.ranks = {}
+        self.order = []
+        self.filter_text = ''
+        self.matching_codes = None
+        self.sort_column = None
+        self.descending = False
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(flush_interval)
+
+    def append(self, row_number, gps_coordinate, code):
+        with self.lock:
+            self.pending.append((row_number, gps_coordinate, code))
+
+    def clear(self):
+        with self.lock:
+            self.pending = []
+        self.beginResetModel()
+        self.row_numbers = []
+        self.gps_coordinates = []
+        self.codes = []
+        self.code_set = set()
+        self.ranks = {}
+        self.order = []
+        self.endResetModel()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return
+        start = len(self.codes)
+        for row_number, gps_coordinate, code in pending:
+            self.row_numbers.append(row_number)
+            self.gps_coordinates.append(gps_coordinate)
+            self.codes.append(code)
+        new_codes = {code for _, _, code in pending} - self.code_set
+        if new_codes:
+            self.code_set |= new_codes
+            self.update_codes()
+        added = [index for index in range(start, len(self.codes)) if self.matches(index)]
+        if not added:
+            return
+        if self.sort_column is not None:
+            key = self.sort_key()
+            added.sort(key=key)
+            appends = not self.order or key(added[0]) >= key(self.order[-1])
+        if self.sort_column is None or appends:
+            # Rows that sort after every existing row land at the bottom of the
+            # view, or at the top when it is sorted in descending order
+            first = 0 if self.descending else len(self.order)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            self.order.extend(added)
+            self.endInsertRows()
+            return
+        if len(added) >= 64:
+            self.beginResetModel()
+            self.order = list(heapq.merge(self.order, added, key=key))
+            self.endResetModel()
+            return
+        for index in added:
+            position = bisect.bisect_right(self.order, key(index), key=key)
+            row = len(self.order) - position if self.descending else position
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self.order.insert(position, index)
+            self.endInsertRows()
+
+    def update_codes(self):
+        ordered = sorted(self.code_set, key=self.pool.address)
+        self.ranks = {code: rank for rank, code in enumerate(ordered)}
+        if self.filter_text:
+            self.matching_codes = {code for code in self.code_set if self.filter_text in self.pool.address(code).lower()}
+
+    def matches(self, index):
+        return self.matching_codes is None or self.codes[index] in self.matching_codes
+
+    def sort_key(self):
+        if self.sort_column == 0:
+            return self.row_numbers.__getitem__
+        if self.sort_column == 1:
+            return self.gps_coordinates.__getitem__
+        return lambda index: self.ranks[self.codes[index]]
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.filter_text = text.strip().lower()
+        self.matching_codes = None
+        if self.filter_text:
+            self.update_codes()
+            self.order = [index for index, code in enumerate(self.codes) if code in self.matching_codes]
+        else:
+            self.order = list(range(len(self.codes)))
+        if self.sort_column is not None:
+            self.order.sort(key=self.sort_key())
+        self.endResetModel()
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column if column >= 0 else None
+        self.descending = self.sort_column is not None and order == QtCore.Qt.DescendingOrder
+        self.order.sort(key=self.sort_key() if self.sort_column is not None else None)
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        row = index.row()
+        position = self.order[len(self.order) - 1 - row] if self.descending else self.order[row]
+        column = index.column()
+        if column == 0:
+            return self.row_numbers[position]
+        if column == 1:
+            return self.gps_coordinates[position]
+        return self.pool.address(self.codes[position])
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
@@ -1,9 +1,42 @@
 from geopy.geocoders import Nominatim
+from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+from address_pool import address_pool
+from rate_limiter import RateLimiter
+from latency_tracker import LatencyTracker
+
+# Nominatim zoom level for each supported resolution
+RESOLUTIONS = {
+    'building': 18,
+    'street': 17,
+    'suburb': 14,
+    'city': 10,
+}
+DEFAULT_RESOLUTION = 'building'
+
+ADDRESS_NOT_FOUND = "Address not found"
+GEOCODING_ERROR = "Error during reverse geocoding"
 
 class ReverseGeocodingService:
-    def __init__(self):
+    provider = 'nominatim'
+    # Nominatim's usage policy allows at most one request per second
+    rate_limiter = RateLimiter(1.0)
+    latency = LatencyTracker(0.5)
+    cost_per_request = 0.0
+
+    # With address_details the address components Nominatim returns are kept in
+    # the address pool next to each address
+    def __init__(self, address_details=False):
         self.geolocator = Nominatim(user_agent="gps_formatter")
+        self.address_details = address_details
 
-    def get_address(self, coordinates):
-        location = self.geolocator.reverse((coordinates.latitude, coordinates.longitude), exactly_one=True)
-        return location.address if location else "Address not found"
+    def get_address(self, coordinates, resolution=DEFAULT_RESOLUTION):
+        try:
+            location = self.geolocator.reverse((coordinates.latitude, coordinates.longitude), exactly_one=True,
+                                               zoom=RESOLUTIONS[resolution], addressdetails=self.address_details)
+            if not location:
+                return ADDRESS_NOT_FOUND
+            details = location.raw.get('address') if self.address_details else None
+            return address_pool.intern(location.address, details)
+        except (GeocoderTimedOut, GeocoderServiceError) as e:
+            print(f"Error during reverse geocoding: {e}")
+            return GEOCODING_ERROR
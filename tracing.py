@@ -0,0 +1,79 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+TRACE_ENV_VAR = 'GPS_FORMATTER_TRACE'
+TRACE_SUFFIX = '.trace.json'
+
+# Records spans in the Chrome trace event format, which Perfetto and
+# chrome://tracing open directly. Events are buffered in memory and streamed to
+# disk every buffer_size events, so memory use does not grow with the run.
+class Tracer:
+    def __init__(self, path, buffer_size=10000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.file = open(path, 'w')
+        self.file.write('[\n')
+        self.first = True
+
+    def add(self, name, start, end, row=None, **args):
+        if row is not None:
+            args['row'] = row
+        event = {
+            'name': name,
+            'cat': 'geocoding',
+            'ph': 'X',
+            'ts': (start - self.origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+            'args': args,
+        }
+        with self.lock:
+            self.buffer.append(event)
+            if len(self.buffer) >= self.buffer_size:
+                self._flush()
+
+    @contextlib.contextmanager
+    def span(self, name, row=None, **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, start, time.perf_counter(), row, **args)
+
+    def _flush(self):
+        for event in self.buffer:
+            if not self.first:
+                self.file.write(',\n')
+            self.file.write(json.dumps(event))
+            self.first = False
+        self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.write('\n]\n')
+            self.file.close()
+
+class NullTracer:
+    def add(self, name, start, end, row=None, **args):
+        pass
+
+    def span(self, name, row=None, **args):
+        return contextlib.nullcontext(args)
+
+    def close(self):
+        pass
+
+# Tracing is opt-in: set GPS_FORMATTER_TRACE=1 to write <output>.trace.json
+def tracer_for(output_path):
+    if os.environ.get(TRACE_ENV_VAR) == '1':
+        return Tracer(output_path + TRACE_SUFFIX)
+    return NullTracer()
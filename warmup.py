@@ -0,0 +1,91 @@
+import logging
+import threading
+from collections import Counter
+from cache_refresher import refresh_cell
+from file_io import read_table, column_values
+from geocode_cache import cell_for, cell_center
+from gps_formatter import parse_coordinates
+from rate_limiter import RateLimiter
+
+MAX_AREA_CELLS = 1000000
+
+def cells_for_bbox(south, west, north, east, resolution):
+    south_cell, west_cell = cell_for(south, west, resolution)
+    north_cell, east_cell = cell_for(north, east, resolution)
+    cell_count = (north_cell - south_cell + 1) * (east_cell - west_cell + 1)
+    if cell_count > MAX_AREA_CELLS:
+        raise ValueError(f"The area covers {cell_count} cells at {resolution} resolution; use a coarser resolution")
+    return Counter({(cell_latitude, cell_longitude): 1
+                    for cell_latitude in range(south_cell, north_cell + 1)
+                    for cell_longitude in range(west_cell, east_cell + 1)})
+
+def point_in_polygon(latitude, longitude, points):
+    inside = False
+    previous_latitude, previous_longitude = points[-1]
+    for point_latitude, point_longitude in points:
+        if (point_latitude > latitude) != (previous_latitude > latitude):
+            crossing = point_longitude + (latitude - point_latitude) * (previous_longitude - point_longitude) / (previous_latitude - point_latitude)
+            if longitude < crossing:
+                inside = not inside
+        previous_latitude, previous_longitude = point_latitude, point_longitude
+    return inside
+
+# points is a list of (latitude, longitude); a cell is covered when its centre is inside
+def cells_for_polygon(points, resolution):
+    latitudes = [latitude for latitude, _ in points]
+    longitudes = [longitude for _, longitude in points]
+    cells = Counter()
+    for cell in cells_for_bbox(min(latitudes), min(longitudes), max(latitudes), max(longitudes), resolution):
+        center = cell_center(resolution, *cell)
+        if point_in_polygon(center.latitude, center.longitude, points):
+            cells[cell] = 1
+    return cells
+
+# Cells holding the file's coordinates, weighted by how many rows fall in each
+def cells_for_file(file_path, resolution):
+    counts = Counter(gps_coordinate.strip() for gps_coordinate in column_values(read_table(file_path), 'GPS Co-ordinates'))
+    cells = Counter()
+    for gps_coordinate, count in counts.items():
+        coordinates = parse_coordinates(gps_coordinate)
+        if coordinates is not None:
+            cells[cell_for(coordinates.latitude, coordinates.longitude, resolution)] += count
+    return cells
+
+# Fills the cache for the given cells on a background thread, densest cells
+# first, skipping cells that are already cached. Like BackgroundRefresher it
+# spends at most `share` of the backend's request rate, so a batch running at
+# the same time keeps most of the budget.
+class CacheWarmer:
+    def __init__(self, service, cache, resolution, cells, max_cells=10000, share=0.25):
+        self.service = service
+        self.cache = cache
+        self.resolution = resolution
+        requests_per_second = service.rate_limiter.requests_per_second
+        self.rate_limiter = RateLimiter(requests_per_second * share if requests_per_second else None)
+        cached = cache.cells(resolution)
+        self.cells = [cell for cell, _ in cells.most_common() if cell not in cached][:max_cells]
+        self.warmed = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        for cell in self.cells:
+            if self.stopped.is_set():
+                return
+            try:
+                self.rate_limiter.wait()
+                if refresh_cell(self.service, self.cache, self.resolution, cell):
+                    self.warmed += 1
+            except Exception as e:
+                logging.error(f"Error warming cache cell {cell}: {e}")
+        logging.info(f"Cache warm-up finished: {self.warmed} of {len(self.cells)} cells")
+
+    def stop(self):
+        self.stopped.set()
+
+    def join(self):
+        self.thread.join()